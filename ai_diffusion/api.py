@@ -1,6 +1,7 @@
 from dataclasses import Field, dataclass, field, is_dataclass, fields, MISSING
 from copy import copy
 from enum import Enum
+from functools import cache
 from types import GenericAlias, UnionType
 from typing import Any, get_args, get_origin
 import math
@@ -239,6 +240,13 @@ def _base_cost(arch: Arch):
     return 1
 
 
+@cache
+def _class_fields(cls) -> tuple[Field, ...]:
+    # fields() rebuilds its result on every call - cache per class, the
+    # serializer walks the same handful of dataclass types for every workflow.
+    return tuple(fields(cls))
+
+
 class Serializer:
     _images: ImageCollection
 
@@ -258,7 +266,7 @@ class Serializer:
     def _object(self, obj) -> dict[str, Any]:
         items = (
             (field.name, self._value(getattr(obj, field.name), field.default))
-            for field in fields(obj)
+            for field in _class_fields(type(obj))
         )
         return {k: v for k, v in items if v is not None}
 
@@ -298,7 +306,7 @@ class Deserializer:
         self._images = images
 
     def _object(self, type, input: dict):
-        values = (self._field(field, input.get(field.name)) for field in fields(type))
+        values = (self._field(field, input.get(field.name)) for field in _class_fields(type))
         return type(*values)
 
     def _field(self, field: Field, value):
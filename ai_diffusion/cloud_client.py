@@ -1,20 +1,19 @@
 import asyncio
-import json
-import math
+import functools
+import hashlib
 import os
 import platform
 import uuid
-from base64 import b64encode
+from collections import deque
 from copy import copy
-from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from itertools import chain
 
 from .api import WorkflowInput
 from .client import Client, ClientEvent, ClientMessage, ClientModels, DeviceInfo, CheckpointInfo
 from .client import ClientFeatures, TranslationPackage, User, loras_to_upload
 from .image import ImageCollection, qt_supports_webp
-from .network import RequestManager, NetworkError
+from .network import NetworkError, json_loads, request_manager
 from .files import File
 from .resources import Arch, ResourceKind, ControlMode, UpscalerName, resource_id
 from .settings import PerformanceSettings, settings
@@ -22,13 +21,26 @@ from .localization import translate as _
 from .util import clamp, ensure, client_logger as log
 from . import resources, __version__ as plugin_version
 
+try:  # SIMD-accelerated base64, Krita's embedded Python only ships the stdlib
+    import pybase64
 
-@dataclass
+    def _b64encode_str(data: bytes) -> str:
+        return pybase64.b64encode_as_string(data)
+
+except ImportError:
+    from base64 import b64encode
+
+    def _b64encode_str(data: bytes) -> str:
+        return b64encode(data).decode("utf-8")
+
+
+@dataclass(slots=True)
 class JobInfo:
     local_id: str
     work: WorkflowInput
     remote_id: str | None = None
     worker_id: str | None = None
+    cancel_event: asyncio.Event = field(default_factory=asyncio.Event)
 
     def __str__(self):
         return f"Job[{self.work.kind.name}, local={self.local_id}, remote={self.remote_id}]"
@@ -50,23 +62,47 @@ class CloudClient(Client):
         self.url = url
         self.models = models
         self.device_info = DeviceInfo("Cloud", "Remote GPU", 24)
-        self._requests = RequestManager()
+        self._requests = request_manager()
         self._token: str = ""
         self._user: User | None = None
-        self._current_job: JobInfo | None = None
-        self._cancel_requested: bool = False
-        self._queue: asyncio.Queue[JobInfo] = asyncio.Queue()
+        self._auth_lock = asyncio.Lock()
+        self._auth_task: asyncio.Task[User] | None = None
+        self._active_jobs: deque[JobInfo] = deque()
+        self._queue: asyncio.Queue[JobInfo] = asyncio.Queue(maxsize=_max_queued_jobs)
+        self._messages: asyncio.Queue[ClientMessage] = asyncio.Queue()
+        self._job_runner: asyncio.Task | None = None
         self._features = enumerate_features({})
+        self._supports_long_poll = True
 
     async def _get(self, op: str):
         return await self._requests.get(f"{self.url}/{op}", bearer=self._token)
 
-    async def _post(self, op: str, data: dict):
-        return await self._requests.post(f"{self.url}/{op}", data, bearer=self._token)
+    async def _post(self, op: str, data: dict, timeout: float | None = None):
+        return await self._requests.post(
+            f"{self.url}/{op}", data, bearer=self._token, timeout=timeout
+        )
+
+    async def _poll_status(self, job: JobInfo):
+        """Request the current status of a remote job. Asks the server to hold the
+        request open until the status changes (long-poll). Servers which don't
+        implement the wait parameter respond immediately - the caller detects this
+        and sleeps in between polls instead."""
+        op = f"status/{job.worker_id}/{job.remote_id}"
+        if self._supports_long_poll:
+            try:
+                return await self._post(
+                    f"{op}?wait={_long_poll_timeout}", {}, timeout=_long_poll_timeout + 10
+                )
+            except NetworkError as e:
+                if e.status not in (404, 501):
+                    raise
+                self._supports_long_poll = False
+                log.info("Server does not support long-polling for job status, using fixed polls")
+        return await self._post(op, {})
 
     async def sign_in(self):
-        client_id = str(uuid.uuid4())
-        info = f"Generative AI for Krita [Device: {platform.node()}]"
+        client_id = uuid.uuid4().hex
+        info = _client_info()
         log.info(f"Sending authorization request for {info} to {self.url}")
         init = await self._post("auth/initiate", dict(client_id=client_id, client_info=info))
 
@@ -75,9 +111,9 @@ class CloudClient(Client):
         yield sign_in_url
 
         auth_confirm = await self._post("auth/confirm", dict(client_id=client_id))
-        time = datetime.now()
+        deadline = asyncio.get_running_loop().time() + 300
         while auth_confirm["status"] == "not-found":
-            if (datetime.now() - time).seconds > 300:
+            if asyncio.get_running_loop().time() > deadline:
                 raise TimeoutError(_("Sign-in attempt timed out after 5 minutes"))
             await asyncio.sleep(2)
             auth_confirm = await self._post("auth/confirm", dict(client_id=client_id))
@@ -93,7 +129,16 @@ class CloudClient(Client):
     async def authenticate(self, token: str):
         if not token:
             raise ValueError("Authorization missing for cloud endpoint")
-        self._token = token
+        # Startup and a manual refresh can request the user info at the same
+        # time - share one in-flight request instead of racing to set _user.
+        async with self._auth_lock:
+            if self._auth_task is None or self._auth_task.done() or token != self._token:
+                self._token = token
+                self._auth_task = asyncio.create_task(self._authenticate())
+            task = self._auth_task
+        return await task
+
+    async def _authenticate(self):
         try:
             user_data = await self._get(f"user?plugin_version={plugin_version}")
         except NetworkError as e:
@@ -116,123 +161,251 @@ class CloudClient(Client):
         return job.local_id
 
     async def listen(self):
+        self._job_runner = asyncio.create_task(self._run_jobs())
         yield ClientMessage(ClientEvent.connected)
-        while True:
+        try:
+            while True:
+                yield await self._messages.get()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._job_runner.cancel()
+
+    async def _report(self, event: ClientEvent, job_id: str, value: float = 0, **kwargs):
+        await self._messages.put(ClientMessage(event, job_id, value, **kwargs))
+
+    async def _run_jobs(self):
+        """Keep the server busy: submit new jobs as soon as there is capacity in the
+        in-flight window instead of waiting for the current job to finish, so the
+        submission round-trip overlaps with server-side generation."""
+        trackers: set[asyncio.Task[None]] = set()
+        try:
+            while True:
+                trackers = {t for t in trackers if not t.done()}
+                if len(trackers) >= _max_inflight_jobs:
+                    await asyncio.wait(trackers, return_when=asyncio.FIRST_COMPLETED)
+                    continue
+                jobs = await self._collect_jobs(_max_inflight_jobs - len(trackers))
+                # Track right away so interrupt/clear_queue can reach jobs which
+                # are still uploading and have no remote id yet.
+                self._active_jobs.extend(jobs)
+                try:
+                    submitted = await self._submit_jobs(jobs)
+                except Exception as e:
+                    log.exception(f"Unhandled exception while submitting {jobs}")
+                    for job in jobs:  # _submit_jobs already removed the jobs it reported
+                        if job in self._active_jobs:
+                            self._active_jobs.remove(job)
+                            await self._report(ClientEvent.error, job.local_id, error=str(e))
+                    continue
+                for job, response in submitted:
+                    trackers.add(asyncio.create_task(self._run_tracker(job, response)))
+        except asyncio.CancelledError:
+            for task in trackers:
+                task.cancel()
+
+    async def _collect_jobs(self, limit: int):
+        """Take the next job from the local queue, plus any more that are enqueued
+        within a short window afterwards. Bursts of jobs are submitted together so
+        their network round-trips overlap."""
+        jobs = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + _batch_window
+        while len(jobs) < limit:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
             try:
-                self._current_job = await self._queue.get()
-                self._cancel_requested = False
-                async for msg in self._process_job(self._current_job):
-                    yield msg
-                    if self._cancel_requested:
-                        yield ClientMessage(ClientEvent.interrupted, self._current_job.local_id)
-                        break
-
-            except NetworkError as e:
-                job_id = self._current_job.local_id if self._current_job else ""
-                if msg := self._process_http_error(e, job_id):
-                    yield msg
-                else:
-                    msg = e.message
-                    log.exception(f"Network error while processing {self._current_job}: {msg}")
-                    if job_id:
-                        yield ClientMessage(ClientEvent.error, job_id, error=msg)
-            except Exception as e:
-                log.exception(f"Unhandled exception while processing {self._current_job}")
-                if self._current_job is not None:
-                    yield ClientMessage(ClientEvent.error, self._current_job.local_id, error=str(e))
-            except asyncio.CancelledError:
+                jobs.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
                 break
-            finally:
-                self._current_job = None
+        return jobs
 
-    async def _process_job(self, job: JobInfo):
+    async def _submit_jobs(self, jobs: list[JobInfo]) -> list[tuple[JobInfo, dict]]:
+        """Upload inputs and start the jobs on the server. Returns the jobs which
+        were successfully submitted with their initial status response. A failure
+        only affects the job it belongs to, the rest of the batch proceeds."""
         user = ensure(self.user)
-        inputs = job.work.to_dict(max_image_size=16 * 1024)
-
-        async for progress in self.send_lora(job.work):
-            yield ClientMessage(ClientEvent.upload, job.local_id, progress)
 
-        await self.send_images(inputs)
+        uploaded: list[tuple[JobInfo, dict]] = []
+        for job in jobs:  # sequential so upload progress is reported in order
+            if job.cancel_event.is_set():
+                await self._drop_interrupted(job)
+                continue
+            try:
+                inputs = job.work.to_dict(max_image_size=16 * 1024)
+                async for progress in self.send_lora(job.work):
+                    await self._report(ClientEvent.upload, job.local_id, progress)
+                await self.send_images(inputs)
+            except NetworkError as e:
+                await self._submit_error(job, e)
+                continue
+            uploaded.append((job, inputs))
+
+        pending: list[tuple[JobInfo, dict]] = []
+        for job, inputs in uploaded:  # interrupt may have fired during a later upload
+            if job.cancel_event.is_set():
+                await self._drop_interrupted(job)
+            else:
+                pending.append((job, inputs))
 
-        data = {
-            "input": {
-                "workflow": inputs,
-                "clientInfo": f"krita-ai-diffusion {plugin_version}",
-                "options": {
-                    "useWebpCompression": qt_supports_webp(),
-                },
-            }
-        }
-        response: dict = await self._post("generate", data)
+        responses = await asyncio.gather(
+            *(self._post("generate", _generate_request(inputs)) for _, inputs in pending),
+            return_exceptions=True,
+        )
+        submitted: list[tuple[JobInfo, dict]] = []
+        for (job, _inputs), response in zip(pending, responses):
+            if isinstance(response, BaseException):
+                await self._submit_error(job, response)
+                continue
+            job.remote_id = response["id"]
+            job.worker_id = response["worker_id"]
+            cost = _update_user(user, response.get("user"))
+            log.info(f"{job} started, cost was {cost}, {user.credits} tokens remaining")
+            await self._report(ClientEvent.progress, job.local_id, 0)
+            if job.cancel_event.is_set():  # interrupted while the request was in flight
+                await self._cancel_remote(job)
+            submitted.append((job, response))
+        return submitted
+
+    async def _drop_interrupted(self, job: JobInfo):
+        log.info(f"{job} was interrupted before it reached the server")
+        self._active_jobs.remove(job)
+        await self._report(ClientEvent.interrupted, job.local_id)
+
+    async def _submit_error(self, job: JobInfo, error: BaseException):
+        log.error(f"Failed to submit {job}: {error}")
+        if job in self._active_jobs:
+            self._active_jobs.remove(job)
+        if isinstance(error, NetworkError):
+            if msg := self._process_http_error(error, job.local_id):
+                await self._messages.put(msg)
+                return
+            await self._report(ClientEvent.error, job.local_id, error=error.message)
+        else:
+            await self._report(ClientEvent.error, job.local_id, error=str(error))
 
-        job.remote_id = response["id"]
-        job.worker_id = response["worker_id"]
-        cost = _update_user(user, response.get("user"))
-        log.info(f"{job} started, cost was {cost}, {user.credits} tokens remaining")
-        yield ClientMessage(ClientEvent.progress, job.local_id, 0)
+    async def _run_tracker(self, job: JobInfo, response: dict):
+        try:
+            await self._track_job(job, response)
+        except NetworkError as e:
+            await self._handle_network_error(e, [job])
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            log.exception(f"Unhandled exception while processing {job}")
+            await self._report(ClientEvent.error, job.local_id, error=str(e))
+        finally:
+            if job in self._active_jobs:
+                self._active_jobs.remove(job)
+
+    async def _handle_network_error(self, e: NetworkError, jobs: list[JobInfo]):
+        log.exception(f"Network error while processing {jobs}: {e.message}")
+        for job in jobs:
+            if msg := self._process_http_error(e, job.local_id):
+                await self._messages.put(msg)
+            else:
+                await self._report(ClientEvent.error, job.local_id, error=e.message)
 
+    async def _track_job(self, job: JobInfo, response: dict):
+        loop = asyncio.get_running_loop()
         status = response["status"].lower()
-        while status == "in_queue" or status == "in_progress":
-            response = await self._post(f"status/{job.worker_id}/{job.remote_id}", {})
+        interval = _poll_interval_min
+        while status in _polling_statuses:
+            poll_start = loop.time()
+            response = await self._poll_status(job)
             status = response["status"].lower()
 
             if status == "in_queue":
-                yield ClientMessage(ClientEvent.queued, job.local_id)
+                await self._report(ClientEvent.queued, job.local_id)
 
             elif status == "in_progress":
                 progress = 0.09
                 if output := response.get("output", None):
                     progress = output.get("progress", progress)
-                yield ClientMessage(ClientEvent.progress, job.local_id, progress)
-            await asyncio.sleep(_poll_interval)
-
-        if status == "completed":
-            output = response["output"]
-            images = await self.receive_images(output["images"])
-            pose = output.get("pose", None)
-            log.info(f"{job} completed, got {len(images)} images{', got pose' if pose else ''}")
-            lora_warning = output.get("lora_warning", False)
-            if lora_warning:
-                log.warning(f"{job} encountered LoRA that could not be applied to the checkpoint")
-            error = "incompatible_lora" if lora_warning else None
-            yield ClientMessage(ClientEvent.finished, job.local_id, 1, images, pose, error=error)
-
-        elif status == "failed":
-            err_msg, err_trace = _extract_error(response, job.remote_id)
-            log.error(f"{job} failed\n{err_msg}\n{err_trace}")
-            yield ClientMessage(ClientEvent.error, job.local_id, error=err_msg)
-
-        elif status == "cancelled":
-            log.info(f"{job} was cancelled")
-            yield ClientMessage(ClientEvent.interrupted, job.local_id)
-
-        elif status == "timed_out":
-            log.warning(f"{job} timed out")
-            msg = _("Generation took too long and was cancelled (timeout)")
-            yield ClientMessage(ClientEvent.error, job.local_id, error=msg)
-        else:
-            log.warning(f"Got unknown job status {status}")
+                await self._report(ClientEvent.progress, job.local_id, progress)
+
+            if loop.time() - poll_start < 1.0:  # server replied without waiting for a change
+                try:  # sleep until the next poll, or wake immediately on interrupt
+                    await asyncio.wait_for(job.cancel_event.wait(), interval)
+                except asyncio.TimeoutError:
+                    pass
+                interval = _next_poll_interval(status, interval)
+
+            if job.cancel_event.is_set():
+                await self._report(ClientEvent.interrupted, job.local_id)
+                return
+
+        handler = _terminal_handlers.get(status, CloudClient._job_unknown_status)
+        await handler(self, job, response)
+
+    async def _job_completed(self, job: JobInfo, response: dict):
+        output = response["output"]
+        images = await self.receive_images(output["images"])
+        pose = output.get("pose", None)
+        log.info(f"{job} completed, got {len(images)} images{', got pose' if pose else ''}")
+        lora_warning = output.get("lora_warning", False)
+        if lora_warning:
+            log.warning(f"{job} encountered LoRA that could not be applied to the checkpoint")
+        error = "incompatible_lora" if lora_warning else None
+        await self._report(
+            ClientEvent.finished, job.local_id, 1, images=images, result=pose, error=error
+        )
+
+    async def _job_failed(self, job: JobInfo, response: dict):
+        err_msg, err_trace = _extract_error(response, job.remote_id)
+        log.error(f"{job} failed\n{err_msg}\n{err_trace}")
+        await self._report(ClientEvent.error, job.local_id, error=err_msg)
+
+    async def _job_cancelled(self, job: JobInfo, response: dict):
+        log.info(f"{job} was cancelled")
+        await self._report(ClientEvent.interrupted, job.local_id)
+
+    async def _job_timed_out(self, job: JobInfo, response: dict):
+        log.warning(f"{job} timed out")
+        msg = _("Generation took too long and was cancelled (timeout)")
+        await self._report(ClientEvent.error, job.local_id, error=msg)
+
+    async def _job_unknown_status(self, job: JobInfo, response: dict):
+        log.warning(f"Got unknown job status {response['status'].lower()}")
+
+    async def _cancel_remote(self, job: JobInfo):
+        job.cancel_event.set()
+        if job.remote_id and job.worker_id:
+            response = await self._post(f"cancel/{job.worker_id}/{job.remote_id}", {})
+            log.info(f"Requested cancellation of {job}: {response}")
 
     async def interrupt(self):
-        if job := self._current_job:
-            self._cancel_requested = True
-            if job.remote_id and job.worker_id:
-                response = await self._post(f"cancel/{job.worker_id}/{job.remote_id}", {})
-                log.info(f"Requested cancellation of {job}: {response}")
+        if self._active_jobs:
+            await self._cancel_remote(self._active_jobs[0])
 
     async def clear_queue(self):
-        self._queue = asyncio.Queue()
+        # Drain in place - replacing the queue object would leave the job runner
+        # waiting on the old queue forever while new jobs go to the new one.
+        while not self._queue.empty():
+            try:
+                self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+        # Jobs beyond the first were submitted ahead of time and already left the
+        # local queue - cancel those on the server. The first job is the active
+        # one, clearing the queue is not supposed to stop it.
+        for job in list(self._active_jobs)[1:]:
+            await self._cancel_remote(job)
 
     @property
     def user(self):
         return self._user
 
+    @property
+    def queued_count(self):
+        return self._queue.qsize() + len(self._active_jobs)
+
     @property
     def performance_settings(self):
         return PerformanceSettings(
-            batch_size=clamp(settings.batch_size, 4, 8),
+            batch_size=clamp(settings.batch_size, 1, 8),
             resolution_multiplier=settings.resolution_multiplier,
-            max_pixel_count=clamp(settings.max_pixel_count, 1, 8),
+            max_pixel_count=clamp(settings.max_pixel_count, 1, _cloud_max_megapixels),
             dynamic_caching=False,
         )
 
@@ -244,16 +417,17 @@ class CloudClient(Client):
         if image_data := inputs.get("image_data"):
             blob, offsets = image_data["bytes"], image_data["offsets"]
             if _base64_size(len(blob)) < max_inline_size:
-                encoded = b64encode(blob).decode("utf-8")
+                encoded = _b64encode_str(blob)
                 inputs["image_data"] = {"base64": encoded, "offsets": offsets}
             else:
                 s3_object = await self._upload_image(blob)
                 inputs["image_data"] = {"s3_object": s3_object, "offsets": offsets}
 
     async def _upload_image(self, data: bytes):
-        upload_info = await self._post("upload/image", {})
+        sha256 = _b64encode_str(hashlib.sha256(data).digest())
+        upload_info = await self._post("upload/image", dict(sha256=sha256))
         log.info(f"Uploading image input to temporary transfer {upload_info['url']}")
-        await self._requests.put(upload_info["url"], data)
+        await self._requests.put(upload_info["url"], data, sha256=sha256)
         return upload_info["object"]
 
     async def send_lora(self, workflow: WorkflowInput):
@@ -290,12 +464,14 @@ class CloudClient(Client):
         offsets = images.get("offsets")
         if not (isinstance(offsets, list) and len(offsets) > 0):
             raise ValueError(f"Could not read result images, invalid offsets: {offsets}")
+        # Decode on a worker thread - multi-MB image decoding would otherwise stall
+        # the event loop and with it progress updates for other in-flight jobs.
         if url := images.get("url"):
             log.info(f"Downloading result images from temporary transfer {url}")
             data = await self._requests.download(url)
-            return ImageCollection.from_bytes(data, offsets)
+            return await asyncio.to_thread(ImageCollection.from_bytes, data, offsets)
         elif b64 := images.get("base64"):
-            return ImageCollection.from_base64(b64, offsets)
+            return await asyncio.to_thread(ImageCollection.from_base64, b64, offsets)
         else:
             raise ValueError(f"No result images found in server response: {str(images)[:80]}")
 
@@ -317,10 +493,33 @@ class CloudClient(Client):
         return None
 
 
+# Job status dispatch: O(1) membership test for the polling loop, handler lookup
+# for terminal states instead of a chain of string comparisons.
+_polling_statuses = frozenset(("in_queue", "in_progress"))
+_terminal_handlers = {
+    "completed": CloudClient._job_completed,
+    "failed": CloudClient._job_failed,
+    "cancelled": CloudClient._job_cancelled,
+    "timed_out": CloudClient._job_timed_out,
+}
+
+
+def _generate_request(workflow: dict):
+    return {
+        "input": {
+            "workflow": workflow,
+            "clientInfo": f"krita-ai-diffusion {plugin_version}",
+            "options": {
+                "useWebpCompression": qt_supports_webp(),
+            },
+        }
+    }
+
+
 def _extract_error(response: dict, job_id: str | None):
     error = response.get("error", f'"Job {job_id} failed (unknown error)"')
     try:
-        error_args = json.loads(error)
+        error_args = json_loads(error)
         err_msg = error_args.get("error_message", error_args)
         err_trace = error_args.get("error_traceback", "No traceback")
     except Exception:
@@ -368,7 +567,7 @@ def apply_limits(work: WorkflowInput, features: ClientFeatures):
 
 
 def _base64_size(size: int):
-    return math.ceil(size / 3) * 4
+    return (size + 2) // 3 * 4
 
 
 def _checkpoint_info(id: str, arch: Arch):
@@ -377,75 +576,114 @@ def _checkpoint_info(id: str, arch: Arch):
     return (res.filename, CheckpointInfo(res.filename, res.arch))
 
 
-_poll_interval = 0.5  # seconds
-
-models = ClientModels()
-models.checkpoints = {
-    filename: info
-    for filename, info in (
-        _checkpoint_info(name, arch)
-        for name, arch in [
-            ("dreamshaper", Arch.sd15),
-            ("realistic_vision", Arch.sd15),
-            ("serenity", Arch.sd15),
-            ("realvis", Arch.sdxl),
-            ("zavychroma", Arch.sdxl),
-            ("flux_schnell", Arch.flux),
-            ("noobai", Arch.illu_v),
-        ]
-    )
-}
-models.vae = []
-models.loras = [
-    "Hyper-SD15-8steps-CFG-lora.safetensors",
-    "Hyper-SDXL-8steps-CFG-lora.safetensors",
-    "ip-adapter-faceid-plusv2_sd15_lora.safetensors",
-    "ip-adapter-faceid-plusv2_sdxl_lora.safetensors",
-]
-models.upscalers = [
-    "4x_NMKD-Superscale-SP_178000_G.pth",
-    "HAT_SRx4_ImageNet-pretrain.pth",
-    "OmniSR_X2_DIV2K.safetensors",
-    "OmniSR_X3_DIV2K.safetensors",
-    "OmniSR_X4_DIV2K.safetensors",
-]
-# fmt: off
-models.resources = {
-    resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.inpaint): "control_v11p_sd15_inpaint_fp16.safetensors",
-    resource_id(ResourceKind.controlnet, Arch.sdxl, ControlMode.universal): "xinsir-controlnet-union-sdxl-1.0-promax.safetensors",
-    resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.scribble): "control_lora_rank128_v11p_sd15_scribble_fp16.safetensors",
-    resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.line_art): "control_v11p_sd15_lineart_fp16.safetensors",
-    resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.soft_edge): "control_v11p_sd15_softedge_fp16.safetensors",
-    resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.canny_edge): "control_v11p_sd15_canny_fp16.safetensors",
-    resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.depth): "control_lora_rank128_v11f1p_sd15_depth_fp16.safetensors",
-    resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.pose): "control_lora_rank128_v11p_sd15_openpose_fp16.safetensors",
-    resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.blur):"control_lora_rank128_v11f1e_sd15_tile_fp16.safetensors",
-    resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.stencil): "control_v1p_sd15_qrcode_monster.safetensors",
-    resource_id(ResourceKind.controlnet, Arch.illu, ControlMode.scribble): "noob-sdxl-controlnet-scribble_pidinet.fp16.safetensors",
-    resource_id(ResourceKind.controlnet, Arch.illu, ControlMode.line_art): "noob-sdxl-controlnet-lineart_anime.fp16.safetensors",
-    resource_id(ResourceKind.controlnet, Arch.illu, ControlMode.canny_edge): "noob_sdxl_controlnet_canny.fp16.safetensors",
-    resource_id(ResourceKind.controlnet, Arch.illu, ControlMode.depth): "noob-sdxl-controlnet-depth_midas-v1-1.fp16.safetensors",
-    resource_id(ResourceKind.controlnet, Arch.illu, ControlMode.pose): "noobaiXLControlnet_openposeModel.safetensors",
-    resource_id(ResourceKind.controlnet, Arch.illu, ControlMode.blur): "noob-sdxl-controlnet-tile.fp16.safetensors",
-    resource_id(ResourceKind.ip_adapter, Arch.sd15, ControlMode.reference): "ip-adapter_sd15.safetensors",
-    resource_id(ResourceKind.ip_adapter, Arch.sdxl, ControlMode.reference): "ip-adapter_sdxl_vit-h.safetensors",
-    resource_id(ResourceKind.ip_adapter, Arch.illu, ControlMode.reference): "noobIPAMARK1_mark1.safetensors",
-    resource_id(ResourceKind.ip_adapter, Arch.sd15, ControlMode.face): "ip-adapter-faceid-plusv2_sd15.bin",
-    resource_id(ResourceKind.ip_adapter, Arch.sdxl, ControlMode.face): "ip-adapter-faceid-plusv2_sdxl.bin",
-    resource_id(ResourceKind.ip_adapter, Arch.flux, ControlMode.reference): "flux1-redux-dev.safetensors",
-    resource_id(ResourceKind.clip_vision, Arch.all, "ip_adapter"): "clip-vision_vit-h.safetensors",
-    resource_id(ResourceKind.clip_vision, Arch.illu, "ip_adapter"): "clip-vision_vit-g.safetensors",
-    resource_id(ResourceKind.clip_vision, Arch.flux, "redux"): "sigclip_vision_patch14_384.safetensors",
-    resource_id(ResourceKind.lora, Arch.sd15, "hyper"): "Hyper-SD15-8steps-CFG-lora.safetensors",
-    resource_id(ResourceKind.lora, Arch.sdxl, "hyper"): "Hyper-SDXL-8steps-CFG-lora.safetensors",
-    resource_id(ResourceKind.lora, Arch.sd15, ControlMode.face): "ip-adapter-faceid-plusv2_sd15_lora.safetensors",
-    resource_id(ResourceKind.lora, Arch.sdxl, ControlMode.face): "ip-adapter-faceid-plusv2_sdxl_lora.safetensors",
-    resource_id(ResourceKind.upscaler, Arch.all, UpscalerName.default): UpscalerName.default.value,
-    resource_id(ResourceKind.upscaler, Arch.all, UpscalerName.fast_2x): UpscalerName.fast_2x.value,
-    resource_id(ResourceKind.upscaler, Arch.all, UpscalerName.fast_3x): UpscalerName.fast_3x.value,
-    resource_id(ResourceKind.upscaler, Arch.all, UpscalerName.fast_4x): UpscalerName.fast_4x.value,
-    resource_id(ResourceKind.inpaint, Arch.sdxl, "fooocus_head"): "fooocus_inpaint_head.pth",
-    resource_id(ResourceKind.inpaint, Arch.sdxl, "fooocus_patch"): "inpaint_v26.fooocus.patch",
-    resource_id(ResourceKind.inpaint, Arch.all, "default"): "MAT_Places512_G_fp16.safetensors",
-}
-# fmt: on
+# Delay between job status polls. Starts at the minimum and backs off while the
+# job sits in the server queue, tightens again once it is being worked on.
+_poll_interval_min = 0.25  # seconds
+_poll_interval = 0.5
+_poll_interval_max = 5.0
+_long_poll_timeout = 30  # seconds the server may hold a status request open
+
+# Jobs enqueued within this window are submitted to the server as one burst.
+_batch_window = 0.05  # seconds
+
+# Maximum number of jobs submitted to the server at the same time. Submitting the
+# next job while the current one runs keeps the server busy between jobs.
+_max_inflight_jobs = 3
+
+# Local queue capacity. Each queued job holds a full WorkflowInput including image
+# data, so enqueue blocks (backpressure) instead of growing memory without bound.
+_max_queued_jobs = 16
+
+# Largest image size (in megapixels) the cloud backend will process in one pass.
+_cloud_max_megapixels = 8
+
+
+@functools.cache
+def _client_info():
+    # platform.node() can hit the filesystem or spawn a process depending on the
+    # OS - look it up once, the hostname doesn't change between sign-in attempts.
+    return f"Generative AI for Krita [Device: {platform.node()}]"
+
+
+def _next_poll_interval(status: str, interval: float):
+    if status == "in_queue":
+        return min(interval * 1.5, _poll_interval_max)
+    return max(_poll_interval, interval * 0.8)
+
+
+@functools.cache
+def _build_models() -> ClientModels:
+    models = ClientModels()
+    models.checkpoints = {
+        filename: info
+        for filename, info in (
+            _checkpoint_info(name, arch)
+            for name, arch in [
+                ("dreamshaper", Arch.sd15),
+                ("realistic_vision", Arch.sd15),
+                ("serenity", Arch.sd15),
+                ("realvis", Arch.sdxl),
+                ("zavychroma", Arch.sdxl),
+                ("flux_schnell", Arch.flux),
+                ("noobai", Arch.illu_v),
+            ]
+        )
+    }
+    models.vae = []
+    models.loras = [
+        "Hyper-SD15-8steps-CFG-lora.safetensors",
+        "Hyper-SDXL-8steps-CFG-lora.safetensors",
+        "ip-adapter-faceid-plusv2_sd15_lora.safetensors",
+        "ip-adapter-faceid-plusv2_sdxl_lora.safetensors",
+    ]
+    models.upscalers = [
+        "4x_NMKD-Superscale-SP_178000_G.pth",
+        "HAT_SRx4_ImageNet-pretrain.pth",
+        "OmniSR_X2_DIV2K.safetensors",
+        "OmniSR_X3_DIV2K.safetensors",
+        "OmniSR_X4_DIV2K.safetensors",
+    ]
+    # fmt: off
+    models.resources = {
+        resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.inpaint): "control_v11p_sd15_inpaint_fp16.safetensors",
+        resource_id(ResourceKind.controlnet, Arch.sdxl, ControlMode.universal): "xinsir-controlnet-union-sdxl-1.0-promax.safetensors",
+        resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.scribble): "control_lora_rank128_v11p_sd15_scribble_fp16.safetensors",
+        resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.line_art): "control_v11p_sd15_lineart_fp16.safetensors",
+        resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.soft_edge): "control_v11p_sd15_softedge_fp16.safetensors",
+        resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.canny_edge): "control_v11p_sd15_canny_fp16.safetensors",
+        resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.depth): "control_lora_rank128_v11f1p_sd15_depth_fp16.safetensors",
+        resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.pose): "control_lora_rank128_v11p_sd15_openpose_fp16.safetensors",
+        resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.blur):"control_lora_rank128_v11f1e_sd15_tile_fp16.safetensors",
+        resource_id(ResourceKind.controlnet, Arch.sd15, ControlMode.stencil): "control_v1p_sd15_qrcode_monster.safetensors",
+        resource_id(ResourceKind.controlnet, Arch.illu, ControlMode.scribble): "noob-sdxl-controlnet-scribble_pidinet.fp16.safetensors",
+        resource_id(ResourceKind.controlnet, Arch.illu, ControlMode.line_art): "noob-sdxl-controlnet-lineart_anime.fp16.safetensors",
+        resource_id(ResourceKind.controlnet, Arch.illu, ControlMode.canny_edge): "noob_sdxl_controlnet_canny.fp16.safetensors",
+        resource_id(ResourceKind.controlnet, Arch.illu, ControlMode.depth): "noob-sdxl-controlnet-depth_midas-v1-1.fp16.safetensors",
+        resource_id(ResourceKind.controlnet, Arch.illu, ControlMode.pose): "noobaiXLControlnet_openposeModel.safetensors",
+        resource_id(ResourceKind.controlnet, Arch.illu, ControlMode.blur): "noob-sdxl-controlnet-tile.fp16.safetensors",
+        resource_id(ResourceKind.ip_adapter, Arch.sd15, ControlMode.reference): "ip-adapter_sd15.safetensors",
+        resource_id(ResourceKind.ip_adapter, Arch.sdxl, ControlMode.reference): "ip-adapter_sdxl_vit-h.safetensors",
+        resource_id(ResourceKind.ip_adapter, Arch.illu, ControlMode.reference): "noobIPAMARK1_mark1.safetensors",
+        resource_id(ResourceKind.ip_adapter, Arch.sd15, ControlMode.face): "ip-adapter-faceid-plusv2_sd15.bin",
+        resource_id(ResourceKind.ip_adapter, Arch.sdxl, ControlMode.face): "ip-adapter-faceid-plusv2_sdxl.bin",
+        resource_id(ResourceKind.ip_adapter, Arch.flux, ControlMode.reference): "flux1-redux-dev.safetensors",
+        resource_id(ResourceKind.clip_vision, Arch.all, "ip_adapter"): "clip-vision_vit-h.safetensors",
+        resource_id(ResourceKind.clip_vision, Arch.illu, "ip_adapter"): "clip-vision_vit-g.safetensors",
+        resource_id(ResourceKind.clip_vision, Arch.flux, "redux"): "sigclip_vision_patch14_384.safetensors",
+        resource_id(ResourceKind.lora, Arch.sd15, "hyper"): "Hyper-SD15-8steps-CFG-lora.safetensors",
+        resource_id(ResourceKind.lora, Arch.sdxl, "hyper"): "Hyper-SDXL-8steps-CFG-lora.safetensors",
+        resource_id(ResourceKind.lora, Arch.sd15, ControlMode.face): "ip-adapter-faceid-plusv2_sd15_lora.safetensors",
+        resource_id(ResourceKind.lora, Arch.sdxl, ControlMode.face): "ip-adapter-faceid-plusv2_sdxl_lora.safetensors",
+        resource_id(ResourceKind.upscaler, Arch.all, UpscalerName.default): UpscalerName.default.value,
+        resource_id(ResourceKind.upscaler, Arch.all, UpscalerName.fast_2x): UpscalerName.fast_2x.value,
+        resource_id(ResourceKind.upscaler, Arch.all, UpscalerName.fast_3x): UpscalerName.fast_3x.value,
+        resource_id(ResourceKind.upscaler, Arch.all, UpscalerName.fast_4x): UpscalerName.fast_4x.value,
+        resource_id(ResourceKind.inpaint, Arch.sdxl, "fooocus_head"): "fooocus_inpaint_head.pth",
+        resource_id(ResourceKind.inpaint, Arch.sdxl, "fooocus_patch"): "inpaint_v26.fooocus.patch",
+        resource_id(ResourceKind.inpaint, Arch.all, "default"): "MAT_Places512_G_fp16.safetensors",
+    }
+    # fmt: on
+    return models
+
+
+models = _build_models()
@@ -12,6 +12,23 @@ from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkRepl
 from .localization import translate as _
 from .util import client_logger as log
 
+try:  # C-accelerated JSON, Krita's embedded Python only ships the stdlib
+    import orjson
+
+    def json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    def json_loads(data):
+        return orjson.loads(data)
+
+except ImportError:
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def json_loads(data):
+        return json.loads(data)
+
 
 class NetworkError(Exception):
     code: int
@@ -40,7 +57,7 @@ class NetworkError(Exception):
         status = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
         if reply.isReadable():
             try:  # extract detailed information from the payload
-                data = json.loads(reply.readAll().data())
+                data = json_loads(reply.readAll().data())
                 error = data.get("error", "Network error")
                 return NetworkError(code, f"{error} ({reply.errorString()})", url, status, data)
             except Exception:
@@ -67,10 +84,26 @@ class Disconnected(Exception):
         super().__init__(self, "Disconnected")
 
 
+class _UploadBuffer(QBuffer):
+    """Read-only QBuffer over an existing QByteArray, used to stream request
+    bodies in chunks instead of having the network layer copy the entire
+    payload into its internal buffer. Holds a reference to the array - the
+    plain QBuffer constructor does not, which would free the data mid-transfer."""
+
+    def __init__(self, data: QByteArray | bytes):
+        super().__init__()
+        if isinstance(data, bytes):
+            data = QByteArray(data)
+        self._data = data
+        self.setBuffer(data)
+        self.open(QBuffer.OpenModeFlag.ReadOnly)
+
+
 class Request(NamedTuple):
     url: str
     future: asyncio.Future
     buffer: QBuffer | None = None
+    upload: _UploadBuffer | None = None  # keeps the streamed request body alive until finished
 
 
 Headers = list[tuple[str, str]]
@@ -97,6 +130,7 @@ class RequestManager:
 
         request = QNetworkRequest(QUrl(url))
         request.setAttribute(QNetworkRequest.FollowRedirectsAttribute, True)
+        request.setAttribute(QNetworkRequest.Http2AllowedAttribute, True)
         request.setRawHeader(b"ngrok-skip-browser-warning", b"69420")
         if bearer:
             request.setRawHeader(b"Authorization", f"Bearer {bearer}".encode("utf-8"))
@@ -107,43 +141,45 @@ class RequestManager:
             request.setTransferTimeout(int(timeout * 1000))
 
         assert method in ["GET", "POST", "PUT"]
+        upload_buffer = None
         if method == "POST":
             data = data or {}
-            data_bytes = QByteArray(json.dumps(data).encode("utf-8"))
+            data_bytes = QByteArray(json_dumps(data))
             request.setHeader(QNetworkRequest.KnownHeaders.ContentTypeHeader, "application/json")
             request.setHeader(QNetworkRequest.KnownHeaders.ContentLengthHeader, data_bytes.size())
             reply = self._net.post(request, data_bytes)
         elif method == "PUT":
-            if isinstance(data, bytes):
-                data = QByteArray(data)
-            assert isinstance(data, QByteArray)
+            assert isinstance(data, (bytes, QByteArray))
+            upload_buffer = _UploadBuffer(data)
             request.setHeader(
                 QNetworkRequest.KnownHeaders.ContentTypeHeader, "application/octet-stream"
             )
-            request.setHeader(QNetworkRequest.KnownHeaders.ContentLengthHeader, data.size())
-            reply = self._net.put(request, data)
+            request.setHeader(
+                QNetworkRequest.KnownHeaders.ContentLengthHeader, upload_buffer.size()
+            )
+            reply = self._net.put(request, upload_buffer)
         else:
             reply = self._net.get(request)
 
         assert reply is not None, f"Network request for {url} failed: reply is None"
         future = asyncio.get_running_loop().create_future()
-        self._requests[reply] = Request(url, future)
+        self._requests[reply] = Request(url, future, upload=upload_buffer)
         return future
 
     def get(self, url: str, bearer="", timeout: float | None = None):
         return self.http("GET", url, bearer=bearer, timeout=timeout)
 
-    def post(self, url: str, data: dict, bearer=""):
-        return self.http("POST", url, data, bearer=bearer)
+    def post(self, url: str, data: dict, bearer="", timeout: float | None = None):
+        return self.http("POST", url, data, bearer=bearer, timeout=timeout)
 
-    def put(self, url: str, data: QByteArray | bytes):
-        return self.http("PUT", url, data)
+    def put(self, url: str, data: QByteArray | bytes, sha256: str | None = None):
+        headers = [("x-amz-checksum-sha256", sha256)] if sha256 else None
+        return self.http("PUT", url, data, headers=headers)
 
     async def upload(self, url: str, data: QByteArray | bytes, sha256: str | None = None):
         self._cleanup()
-        if isinstance(data, bytes):
-            data = QByteArray(data)
-        assert isinstance(data, QByteArray)
+        upload_buffer = _UploadBuffer(data)
+        size = upload_buffer.size()
 
         request = QNetworkRequest(QUrl(url))
         request.setAttribute(QNetworkRequest.Attribute.FollowRedirectsAttribute, True)
@@ -152,14 +188,14 @@ class RequestManager:
         request.setHeader(
             QNetworkRequest.KnownHeaders.ContentTypeHeader, "application/octet-stream"
         )
-        request.setHeader(QNetworkRequest.KnownHeaders.ContentLengthHeader, data.size())
-        reply = self._net.put(request, data)
+        request.setHeader(QNetworkRequest.KnownHeaders.ContentLengthHeader, size)
+        reply = self._net.put(request, upload_buffer)
         assert reply is not None, f"Network request for {url} failed: reply is None"
 
         reply.uploadProgress.connect(self._upload_progress)
         self._upload_future = asyncio.get_running_loop().create_future()
         finished_future = asyncio.get_running_loop().create_future()
-        self._requests[reply] = Request(url, finished_future)
+        self._requests[reply] = Request(url, finished_future, upload=upload_buffer)
         while self._upload_future is not None:
             fut = next(asyncio.as_completed([self._upload_future, finished_future]))
             progress = await fut
@@ -167,7 +203,7 @@ class RequestManager:
                 self._upload_future = asyncio.get_running_loop().create_future()
                 yield progress
             else:
-                yield (len(data), len(data))
+                yield (size, size)
                 break
 
     def download(self, url: str):
@@ -204,6 +240,8 @@ class RequestManager:
             code = reply.error()  # type: ignore (bug in PyQt5-stubs)
             tracker = self._requests[reply]
             future = tracker.future
+            if tracker.upload is not None:
+                tracker.upload.close()
             if future.cancelled():
                 return  # operation was cancelled, discard result
             if code == QNetworkReply.NetworkError.NoError:
@@ -214,7 +252,7 @@ class RequestManager:
                     content_type = reply.header(QNetworkRequest.KnownHeaders.ContentTypeHeader)
                     data = reply.readAll().data()
                     if content_type and ("application/json" in content_type):
-                        future.set_result(json.loads(data))
+                        future.set_result(json_loads(data))
                     else:
                         future.set_result(data)
             else:
@@ -233,6 +271,19 @@ class RequestManager:
             log.warning(f"SSL error: {error.errorString()} [{error.error()}]")
 
 
+_request_manager: RequestManager | None = None
+
+
+def request_manager():
+    """Process-wide shared RequestManager. Using a single QNetworkAccessManager
+    keeps TCP+TLS connections alive across clients and reconnects, instead of
+    paying a fresh handshake for every new client instance."""
+    global _request_manager
+    if _request_manager is None:
+        _request_manager = RequestManager()
+    return _request_manager
+
+
 class DownloadProgress(NamedTuple):
     received: float  # in mb
     total: float  # in mb
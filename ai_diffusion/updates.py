@@ -9,7 +9,7 @@ from typing import NamedTuple
 from PyQt5.QtCore import QObject, pyqtSignal
 
 from . import __version__, eventloop
-from .network import RequestManager
+from .network import RequestManager, request_manager
 from .properties import ObservableProperties, Property
 from .util import ZipFile, client_logger as log
 
@@ -132,7 +132,7 @@ class AutoUpdate(QObject, ObservableProperties):
     @property
     def _net(self):
         if self._request_manager is None:
-            self._request_manager = RequestManager()
+            self._request_manager = request_manager()
         return self._request_manager
 
     async def _handle_errors(self, func, error_state: UpdateState, message: str):
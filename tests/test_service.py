@@ -10,6 +10,7 @@ from ai_diffusion.api import WorkflowInput, WorkflowKind, ControlInput, ImageInp
 from ai_diffusion.api import SamplingInput, ConditioningInput, ExtentInput, RegionInput
 from ai_diffusion.client import Client, ClientEvent
 from ai_diffusion.cloud_client import CloudClient, enumerate_features, apply_limits
+from ai_diffusion.cloud_client import _next_poll_interval, _poll_interval_min, _poll_interval_max
 from ai_diffusion.image import Extent, Image, Bounds
 from ai_diffusion.resources import ControlMode, Arch
 from ai_diffusion.util import ensure
@@ -225,3 +226,24 @@ def test_features_limits():
     assert work.conditioning and len(work.conditioning.control) == 2
     assert work.conditioning and len(work.conditioning.regions[0].control) == 2
     assert work.models and work.models.self_attention_guidance is False
+
+
+def test_base64_size():
+    from base64 import b64encode
+    from ai_diffusion.cloud_client import _base64_size
+
+    for size in [0, 1, 2, 3, 4, 100, 3 * 4096, 3 * 4096 + 1]:
+        assert _base64_size(size) == len(b64encode(b"x" * size))
+
+
+def test_poll_interval():
+    interval = _poll_interval_min
+    for _ in range(20):
+        assert _poll_interval_min <= interval <= _poll_interval_max
+        interval = _next_poll_interval("in_queue", interval)
+    assert interval == _poll_interval_max
+
+    for _ in range(20):
+        interval = _next_poll_interval("in_progress", interval)
+        assert interval < _poll_interval_max
+    assert interval == 0.5